@@ -1,13 +1,17 @@
 import time
 
+import pytest
+
 import ubuntu_desktop_control.server as server
 
 
 class DummyPyAutoGUI:
     def __init__(self):
         self.click_calls = []
+        self.size_calls = 0
 
     def size(self):
+        self.size_calls += 1
         return (1000, 800)
 
     def click(self, x, y, clicks=1, button="left"):
@@ -22,25 +26,25 @@ class DummyPyAutoGUIForScreenshot:
         raise RuntimeError("screenshot not supported in test")
 
 
-def setup_function(_):
+@pytest.fixture(autouse=True)
+def _reset_server_globals():
     server._ELEMENT_CACHE = None
     server._pyautogui = None
     server._pyautogui_error = None
+    server._SCREEN_SIZE_CACHE = None
+    yield
 
 
-def test_click_screen_percent_coordinates(monkeypatch):
+@pytest.fixture
+def dummy_pyautogui(monkeypatch):
     dummy = DummyPyAutoGUI()
     monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
-    result = server.click_screen(x_percent=0.5, y_percent=0.25)
-    assert result.success is True
-    assert dummy.click_calls == [{"x": 500, "y": 200, "clicks": 1, "button": "left"}]
+    return dummy
 
 
-def test_click_screen_element_id_uses_cache(monkeypatch):
-    dummy = DummyPyAutoGUI()
-    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
-    monkeypatch.setattr(server, "_get_active_app_name", lambda: None)
-    monkeypatch.setattr(server, "_attempt_atspi_action", lambda *_args, **_kwargs: (False, None))
+@pytest.fixture
+def element_cache():
+    elements = {}
     server._ELEMENT_CACHE = {
         "meta": {
             "logical_width": 1000,
@@ -50,27 +54,62 @@ def test_click_screen_element_id_uses_cache(monkeypatch):
             "monitor_index": None,
             "monitor_origin": None,
         },
-        "elements": {
-            1: {"x_percent": 0.2, "y_percent": 0.4},
-        },
+        "elements": elements,
         "captured_at": time.monotonic(),
     }
+    yield elements
+    server._ELEMENT_CACHE = None
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        ({}, {"clicks": 1, "button": "left"}),
+        ({"button": "right"}, {"clicks": 1, "button": "right"}),
+        ({"clicks": 2}, {"clicks": 2, "button": "left"}),
+    ],
+)
+def test_click_screen_percent_coordinates(dummy_pyautogui, kwargs, expected):
+    result = server.click_screen(x_percent=0.5, y_percent=0.25, **kwargs)
+    assert result.success is True
+    assert result.button == expected["button"]
+    assert result.clicks == expected["clicks"]
+    assert dummy_pyautogui.click_calls == [{"x": 500, "y": 200, **expected}]
+
+
+def test_click_screen_element_id_uses_cache(monkeypatch, dummy_pyautogui, element_cache):
+    monkeypatch.setattr(server, "_get_active_app_name", lambda: None)
+    monkeypatch.setattr(server, "_attempt_atspi_action", lambda *_args, **_kwargs: (False, None))
+    element_cache[1] = {"x_percent": 0.2, "y_percent": 0.4}
     result = server.click_screen(element_id=1)
     assert result.success is True
-    assert dummy.click_calls == [{"x": 200, "y": 320, "clicks": 1, "button": "left"}]
+    assert dummy_pyautogui.click_calls == [{"x": 200, "y": 320, "clicks": 1, "button": "left"}]
 
 
-def test_click_screen_invalid_button(monkeypatch):
-    dummy = DummyPyAutoGUI()
-    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+def test_click_screen_invalid_button(dummy_pyautogui):
     result = server.click_screen(x_percent=0.1, y_percent=0.1, button="invalid")
     assert result.success is False
     assert "Invalid button" in (result.error or "")
 
 
-def test_click_screen_missing_coords(monkeypatch):
-    dummy = DummyPyAutoGUI()
-    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+def test_click_screen_missing_coords(dummy_pyautogui):
     result = server.click_screen()
     assert result.success is False
     assert "Must provide" in (result.error or "")
+
+
+def test_click_screen_reuses_screen_size_between_clicks(dummy_pyautogui):
+    server.click_screen(x_percent=0.1, y_percent=0.1)
+    server.click_screen(x_percent=0.2, y_percent=0.2)
+    assert len(dummy_pyautogui.click_calls) == 2
+    assert dummy_pyautogui.size_calls == 1
+
+
+def test_refresh_screen_cache_requeries_size(dummy_pyautogui, monkeypatch):
+    monkeypatch.setattr(server, "_detect_scaling_factor", lambda *_args, **_kw: (1.0, None))
+    monkeypatch.setattr(server, "_get_mss_monitors", lambda: ([], None))
+    server.click_screen(x_percent=0.1, y_percent=0.1)
+    info = server.refresh_screen_cache()
+    assert info.success is True
+    assert (info.width, info.height) == (1000, 800)
+    assert dummy_pyautogui.size_calls == 2
@@ -0,0 +1,437 @@
+import contextlib
+import threading
+
+import pytest
+
+import ubuntu_desktop_control.server as server
+
+
+class DummyPyAutoGUI:
+    pass
+
+
+def _result(success=True):
+    return server.MouseClickResult(
+        success=success,
+        x=10,
+        y=20,
+        button="left",
+        clicks=1,
+        error=None if success else "boom",
+    )
+
+
+def _install_fakes(monkeypatch, fail_on=None):
+    calls = []
+    lock = threading.Lock()
+
+    def record(name, **kwargs):
+        with lock:
+            calls.append((name, kwargs))
+        return _result(fail_on != (name, kwargs.get("x_percent")))
+
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: DummyPyAutoGUI())
+    monkeypatch.setattr(server, "click_screen", lambda **kw: record("click", **kw))
+    monkeypatch.setattr(server, "move_mouse", lambda **kw: record("move", **kw))
+    monkeypatch.setattr(server, "type_text", lambda **kw: record("type", **kw))
+    return calls
+
+
+def test_execute_workflow_sequential_stops_on_failure(monkeypatch):
+    calls = _install_fakes(monkeypatch, fail_on=("click", 0.2))
+    result = server.execute_workflow(
+        actions=[
+            {"action": "click", "x_percent": 0.1, "y_percent": 0.1},
+            {"action": "click", "x_percent": 0.2, "y_percent": 0.1},
+            {"action": "type", "text": "never"},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is False
+    assert result.actions_completed == 1
+    assert [name for name, _ in calls] == ["click", "click"]
+
+
+def test_execute_workflow_parallel_runs_independent_actions_concurrently(monkeypatch):
+    _install_fakes(monkeypatch)
+    monkeypatch.setattr(server, "_WORKFLOW_DESKTOP_LOCK", contextlib.nullcontext())
+    barrier = threading.Barrier(2, timeout=2)
+
+    def move(**kw):
+        barrier.wait()
+        return _result()
+
+    monkeypatch.setattr(server, "move_mouse", move)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "move", "x_percent": 0.1, "y_percent": 0.1},
+            {"action": "move", "x_percent": 0.9, "y_percent": 0.9, "depends_on": []},
+            {"action": "type", "text": "after", "depends_on": [0, 1]},
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is True
+    assert result.actions_completed == 3
+    assert [r["action"] for r in result.results] == ["move", "move", "type"]
+
+
+def test_execute_workflow_parallel_skips_dependents_of_failure(monkeypatch):
+    calls = _install_fakes(monkeypatch, fail_on=("click", 0.5))
+    result = server.execute_workflow(
+        actions=[
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5},
+            {"action": "type", "text": "skipped", "depends_on": [0]},
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is False
+    assert result.actions_completed == 0
+    assert [name for name, _ in calls] == ["click"]
+
+
+def test_execute_workflow_parallel_rejects_forward_dependency(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5, "depends_on": [1]},
+            {"action": "type", "text": "x"},
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is False
+    assert "depends_on" in result.error
+    assert calls == []
+
+
+def test_execute_workflow_coalesces_consecutive_type_actions(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "type", "text": "user"},
+            {"action": "type", "text": "@example.com"},
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5},
+            {"action": "type", "text": "x"},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is True
+    assert result.actions_completed == 4
+    assert [r["action"] for r in result.results] == ["type", "type", "click", "type"]
+    assert [r.get("text_length") for r in result.results] == [4, 12, None, 1]
+    assert calls == [
+        ("type", {"text": "user@example.com", "interval": 0.0}),
+        ("click", {"x_percent": 0.5, "y_percent": 0.5, "element_id": None, "button": "left", "clicks": 1, "monitor_index": None}),
+        ("type", {"text": "x", "interval": 0.0}),
+    ]
+
+
+def test_execute_workflow_parallel_single_action_runs_inline(monkeypatch):
+    import concurrent.futures
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("thread pool should not be used")
+
+    monkeypatch.setattr(concurrent.futures, "ThreadPoolExecutor", no_pool)
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[{"action": "type", "text": "solo"}],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is True
+    assert [name for name, _ in calls] == ["type"]
+
+
+def test_execute_workflow_folds_consecutive_waits(monkeypatch):
+    _install_fakes(monkeypatch)
+    sleeps = []
+    monkeypatch.setattr(server.time, "sleep", sleeps.append)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "wait", "duration": 0.1},
+            {"action": "wait", "duration": 0.2},
+            {"action": "type", "text": "x"},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is True
+    assert [r.get("duration") for r in result.results] == [0.1, 0.2, None]
+    assert sleeps == [pytest.approx(0.3)]
+
+
+def _install_screenshot_fake(monkeypatch):
+    formats = []
+
+    def take_screenshot(**kw):
+        formats.append(kw.get("image_format"))
+        return server.AnnotatedScreenshot(
+            success=True,
+            screenshot_path=f"/tmp/shot{len(formats)}.{kw.get('image_format')}",
+            screenshot_hash="abc",
+            display_width=1280,
+            display_height=720,
+            actual_width=1920,
+            actual_height=1080,
+            scaling_info="",
+        )
+
+    monkeypatch.setattr(server, "take_screenshot", take_screenshot)
+    return formats
+
+
+def test_execute_workflow_screenshot_format_applies_to_all_screenshots(monkeypatch):
+    _install_fakes(monkeypatch)
+    formats = _install_screenshot_fake(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "screenshot"},
+            {"action": "screenshot", "image_format": "png"},
+        ],
+        screenshot_format="webp",
+    )
+    assert result.success is True
+    assert formats == ["webp", "png", "webp"]
+    assert result.results[0]["screenshot_hash"] == "abc"
+    assert result.final_screenshot == "/tmp/shot3.webp"
+
+
+def test_execute_workflow_subtree_skips_only_dependents(monkeypatch):
+    calls = _install_fakes(monkeypatch, fail_on=("click", 0.5))
+    result = server.execute_workflow(
+        actions=[
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5},
+            {"action": "type", "text": "skipped", "depends_on": [0]},
+            {"action": "move", "x_percent": 0.1, "y_percent": 0.1, "depends_on": []},
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+        on_error="subtree",
+    )
+    assert result.success is False
+    assert result.actions_completed == 1
+    assert sorted(name for name, _ in calls) == ["click", "move"]
+    assert result.results[1]["skipped"] is True
+    assert [r["success"] for r in result.results] == [False, False, True]
+
+
+def test_execute_workflow_continue_runs_past_failure(monkeypatch):
+    calls = _install_fakes(monkeypatch, fail_on=("click", 0.5))
+    result = server.execute_workflow(
+        actions=[
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5},
+            {"action": "type", "text": "a"},
+            {"action": "type", "text": "b"},
+        ],
+        take_final_screenshot=False,
+        on_error="continue",
+    )
+    assert result.success is False
+    assert result.actions_completed == 2
+    assert [name for name, _ in calls] == ["click", "type", "type"]
+
+
+def test_execute_workflow_rejects_invalid_action_before_side_effects(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5},
+            {"action": "click", "x_percent": 5.0, "y_percent": 0.5},
+            {"action": "teleport"},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is False
+    assert result.actions_completed == 0
+    assert calls == []
+    assert [r["index"] for r in result.results] == [1, 2]
+    assert "between 0.0 and 1.0" in result.error
+
+
+def test_execute_workflow_reuses_trailing_screenshot_as_final(monkeypatch):
+    _install_fakes(monkeypatch)
+    formats = _install_screenshot_fake(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "type", "text": "x"},
+            {"action": "screenshot"},
+        ],
+    )
+    assert result.success is True
+    assert len(formats) == 1
+    assert result.final_screenshot == result.results[-1]["screenshot_path"]
+
+
+def test_execute_workflow_fuses_move_then_click_on_same_target(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "move", "x_percent": 0.3, "y_percent": 0.4},
+            {"action": "click", "x_percent": 0.3, "y_percent": 0.4},
+            {"action": "move", "x_percent": 0.3, "y_percent": 0.4, "duration": 0.2},
+            {"action": "click", "x_percent": 0.3, "y_percent": 0.4},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is True
+    assert result.actions_completed == 4
+    assert [r["action"] for r in result.results] == ["move", "click", "move", "click"]
+    assert [name for name, _ in calls] == ["click", "move", "click"]
+
+
+def test_execute_workflow_parallel_stop_cancels_queued_actions(monkeypatch):
+    import time
+
+    _install_fakes(monkeypatch)
+    monkeypatch.setattr(server, "_WORKFLOW_DESKTOP_LOCK", contextlib.nullcontext())
+    started = []
+
+    def move(**kw):
+        started.append(kw["x_percent"])
+        if kw["x_percent"] == 0.0:
+            return _result(False)
+        time.sleep(0.2)
+        return _result()
+
+    monkeypatch.setattr(server, "move_mouse", move)
+    count = server._WORKFLOW_MAX_WORKERS * 2
+    result = server.execute_workflow(
+        actions=[
+            {"action": "move", "x_percent": i / 10, "y_percent": 0.5, "depends_on": []}
+            for i in range(count)
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is False
+    assert len(started) == server._WORKFLOW_MAX_WORKERS
+    assert result.actions_completed == server._WORKFLOW_MAX_WORKERS - 1
+
+
+def test_execute_workflow_parallel_serialises_desktop_actions(monkeypatch):
+    import time
+
+    calls = _install_fakes(monkeypatch)
+    active = []
+    overlaps = []
+
+    def type_text(**kw):
+        active.append(kw["text"])
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        active.remove(kw["text"])
+        return _result()
+
+    monkeypatch.setattr(server, "type_text", type_text)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "type", "text": "a"},
+            {"action": "type", "text": "b", "depends_on": []},
+            {"action": "wait", "duration": 0.05, "depends_on": []},
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is True
+    assert overlaps == [1, 1]
+    assert calls == []
+
+
+def test_execute_workflow_does_not_fuse_element_targets(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "move", "element_id": 4},
+            {"action": "click", "element_id": 4},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is True
+    assert [name for name, _ in calls] == ["move", "click"]
+
+
+def test_execute_workflow_rejects_unknown_screenshot_format(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[{"action": "type", "text": "x"}],
+        screenshot_format="jpeg",
+    )
+    assert result.success is False
+    assert "screenshot_format" in result.error
+    assert calls == []
+
+
+def test_execute_workflow_malformed_action_returns_result(monkeypatch):
+    _install_fakes(monkeypatch)
+    result = server.execute_workflow(actions=[{"action": None}], screenshot_format="webp")
+    assert result.success is False
+    assert result.results[0]["index"] == 0
+
+
+@pytest.mark.parametrize(
+    "bad_action, message",
+    [
+        ({"action": "screenshot", "image_format": "jpeg"}, "image_format"),
+        ({"action": "click", "x_percent": 0.5, "y_percent": 0.5, "button": "side"}, "button"),
+        ({"action": "wait", "duration": -1}, "duration"),
+        ({"action": "type", "text": "x", "interval": -0.1}, "interval"),
+    ],
+)
+def test_execute_workflow_rejects_bad_parameters_before_side_effects(monkeypatch, bad_action, message):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[{"action": "click", "x_percent": 0.5, "y_percent": 0.5}, bad_action],
+        take_final_screenshot=False,
+    )
+    assert result.success is False
+    assert calls == []
+    assert result.results[0]["index"] == 1
+    assert message in result.error
+
+
+def test_execute_workflow_parallel_results_carry_action_index(monkeypatch):
+    calls = _install_fakes(monkeypatch, fail_on=("click", 0.5))
+    result = server.execute_workflow(
+        actions=[
+            {"action": "wait", "duration": 0.2, "depends_on": []},
+            {"action": "type", "text": "never", "depends_on": [0]},
+            {"action": "click", "x_percent": 0.5, "y_percent": 0.5, "depends_on": []},
+        ],
+        take_final_screenshot=False,
+        parallel=True,
+    )
+    assert result.success is False
+    assert [(r["index"], r["action"]) for r in result.results] == [(0, "wait"), (2, "click")]
+    assert [name for name, _ in calls] == ["click"]
+
+
+def test_execute_workflow_type_batch_treats_missing_text_as_empty(monkeypatch):
+    calls = _install_fakes(monkeypatch)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "type", "text": None},
+            {"action": "type", "text": "ok"},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is True
+    assert [r["text_length"] for r in result.results] == [0, 2]
+    assert calls == [("type", {"text": "ok", "interval": 0.0})]
+
+
+def test_execute_workflow_wait_batch_defaults_null_duration(monkeypatch):
+    _install_fakes(monkeypatch)
+    sleeps = []
+    monkeypatch.setattr(server.time, "sleep", sleeps.append)
+    result = server.execute_workflow(
+        actions=[
+            {"action": "wait", "duration": None},
+            {"action": "wait", "duration": 0.25},
+        ],
+        take_final_screenshot=False,
+    )
+    assert result.success is True
+    assert [r["duration"] for r in result.results] == [0.5, 0.25]
+    assert sleeps == [pytest.approx(0.75)]
@@ -8,14 +8,37 @@ class DummyPyAutoGUI:
         return (100, 100)
 
 
-def test_map_gui_elements_coordinate_space(monkeypatch, tmp_path):
+def _rectangle_image():
+    import cv2
+
     image = np.zeros((100, 100, 3), dtype=np.uint8)
-    path = tmp_path / "test.png"
+    cv2.rectangle(image, (10, 10), (40, 40), (255, 255, 255), 2)
+    return image
+
+
+def _has_box_near(elements, x, y, width, height, tolerance=4):
+    return any(
+        abs(e.x - x) <= tolerance
+        and abs(e.y - y) <= tolerance
+        and abs(e.width - width) <= 2 * tolerance
+        and abs(e.height - height) <= 2 * tolerance
+        for e in elements
+    )
 
+
+def test_map_gui_elements_from_array_detects_rectangle():
+    result = server._map_gui_elements_from_array(_rectangle_image())
+    assert result.success is True
+    assert result.coordinates == "physical"
+    assert _has_box_near(result.elements, 10, 10, 31, 31)
+    assert all((e.center_x, e.center_y) == (25, 25) for e in result.elements)
+
+
+def test_map_gui_elements_coordinate_space(monkeypatch, tmp_path):
     import cv2
 
-    cv2.rectangle(image, (10, 10), (40, 40), (255, 255, 255), 2)
-    cv2.imwrite(str(path), image)
+    path = tmp_path / "test.png"
+    cv2.imwrite(str(path), _rectangle_image())
 
     monkeypatch.setattr(server, "_get_pyautogui", lambda: DummyPyAutoGUI())
     monkeypatch.setattr(server, "_detect_scaling_factor", lambda *args, **kwargs: (1.0, None))
@@ -25,4 +48,5 @@ def test_map_gui_elements_coordinate_space(monkeypatch, tmp_path):
     result = server.map_GUI_elements_location(screenshot_path=str(path))
     assert result.success is True
     assert result.coordinates == "logical"
-    assert result.count >= 1
+    assert result.screenshot_path == str(path)
+    assert _has_box_near(result.elements, 10, 10, 31, 31)
@@ -0,0 +1,39 @@
+import ubuntu_desktop_control.server as server
+
+
+class DummyPyAutoGUI:
+    def __init__(self, fail_on=None):
+        self.hotkey_calls = []
+        self.fail_on = fail_on
+
+    def hotkey(self, *keys):
+        if list(keys) == self.fail_on:
+            raise RuntimeError("key not supported")
+        self.hotkey_calls.append(list(keys))
+
+
+def test_press_hotkeys_presses_each_combo_in_order(monkeypatch):
+    dummy = DummyPyAutoGUI()
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+    result = server.press_hotkeys([["ctrl", "a"], ["ctrl", "c"], ["escape"]])
+    assert result.success is True
+    assert result.clicks == 3
+    assert dummy.hotkey_calls == [["ctrl", "a"], ["ctrl", "c"], ["escape"]]
+
+
+def test_press_hotkeys_stops_on_first_failure(monkeypatch):
+    dummy = DummyPyAutoGUI(fail_on=["ctrl", "c"])
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+    result = server.press_hotkeys([["ctrl", "a"], ["ctrl", "c"], ["escape"]])
+    assert result.success is False
+    assert result.clicks == 1
+    assert dummy.hotkey_calls == [["ctrl", "a"]]
+    assert "Hotkey 2 of 3 failed" in (result.error or "")
+
+
+def test_press_hotkeys_rejects_empty_combo(monkeypatch):
+    dummy = DummyPyAutoGUI()
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+    result = server.press_hotkeys([["ctrl", "a"], []])
+    assert result.success is False
+    assert dummy.hotkey_calls == []
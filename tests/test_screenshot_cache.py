@@ -0,0 +1,54 @@
+from PIL import Image
+
+import ubuntu_desktop_control.server as server
+
+
+def test_save_image_dedup_reuses_identical_frame(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "_SAVED_IMAGE_CACHE", server.OrderedDict())
+    first = server._save_image_dedup(Image.new("RGB", (8, 8), "red"), str(tmp_path / "a.png"))
+    second = server._save_image_dedup(Image.new("RGB", (8, 8), "red"), str(tmp_path / "b.png"))
+    assert first == second == str(tmp_path / "a.png")
+    assert not (tmp_path / "b.png").exists()
+
+
+def test_save_image_dedup_writes_changed_frame(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "_SAVED_IMAGE_CACHE", server.OrderedDict())
+    server._save_image_dedup(Image.new("RGB", (8, 8), "red"), str(tmp_path / "a.png"))
+    path = server._save_image_dedup(Image.new("RGB", (8, 8), "blue"), str(tmp_path / "b.png"))
+    assert path == str(tmp_path / "b.png")
+    assert (tmp_path / "b.png").exists()
+    assert server.screenshot_hash(Image.new("RGB", (8, 8), "red")) != server.screenshot_hash(
+        Image.new("RGB", (8, 8), "blue")
+    )
+
+
+def test_downsample_screenshot_area_resize():
+    image = Image.new("RGB", (40, 20), "white")
+    image.paste((0, 0, 0), (0, 0, 20, 20))
+    small = server._downsample_screenshot(image, (4, 2))
+    assert small.size == (4, 2)
+    assert small.mode == "RGB"
+    assert small.getpixel((0, 0)) == (0, 0, 0)
+    assert small.getpixel((3, 1)) == (255, 255, 255)
+
+
+def test_downsample_screenshot_fast_path_keeps_size():
+    image = Image.new("RGB", (40, 20), "white")
+    small = server._downsample_screenshot(image, (4, 2), fast=True)
+    assert small.size == (4, 2)
+    assert small.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_save_image_dedup_forgets_overwritten_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "_SAVED_IMAGE_CACHE", server.OrderedDict())
+    shared = str(tmp_path / "shared.png")
+    server._save_image_dedup(Image.new("RGB", (8, 8), "red"), shared)
+    server._save_image_dedup(Image.new("RGB", (8, 8), "blue"), shared)
+    path = server._save_image_dedup(Image.new("RGB", (8, 8), "red"), str(tmp_path / "q.png"))
+    assert path == str(tmp_path / "q.png")
+    with Image.open(path) as saved:
+        assert saved.getpixel((0, 0)) == (255, 0, 0)
+
+
+def test_capture_timestamps_are_unique():
+    assert server._capture_timestamp() != server._capture_timestamp()
@@ -0,0 +1,94 @@
+import pytest
+
+import ubuntu_desktop_control.server as server
+
+
+class DummyPyAutoGUI:
+    def __init__(self):
+        self.write_calls = []
+
+    def write(self, text, interval=0.0):
+        self.write_calls.append({"text": text, "interval": interval})
+
+
+class FakeDisplay:
+    SHIFT = 50
+
+    def __init__(self):
+        self.sync_count = 0
+
+    def keysym_to_keycodes(self, keysym):
+        if keysym == ord("A"):
+            return [(38, 1)]
+        if keysym == ord("é"):
+            return []
+        return [(keysym % 200 + 8, 0)]
+
+    def keysym_to_keycode(self, keysym):
+        return self.SHIFT
+
+    def sync(self):
+        self.sync_count += 1
+
+
+@pytest.fixture(autouse=True)
+def _reset_server_globals(monkeypatch):
+    monkeypatch.setenv("DISPLAY", ":99")
+    server._XTEST_KEYCODES.clear()
+    yield
+    server._XTEST_KEYCODES.clear()
+
+
+@pytest.fixture
+def fake_xtest(monkeypatch):
+    from Xlib.ext import xtest
+
+    display = FakeDisplay()
+    events = []
+    monkeypatch.setattr(server, "_get_xlib_display", lambda: display)
+    monkeypatch.setattr(xtest, "fake_input", lambda _disp, event, keycode: events.append((event, keycode)))
+    return display, events
+
+
+def test_type_text_uses_single_xtest_sync(monkeypatch, fake_xtest):
+    from Xlib import X
+
+    display, events = fake_xtest
+    dummy = DummyPyAutoGUI()
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+
+    result = server.type_text("hA")
+    assert result.success is True
+    assert dummy.write_calls == []
+    assert display.sync_count == 1
+    assert events == [
+        (X.KeyPress, ord("h") % 200 + 8),
+        (X.KeyRelease, ord("h") % 200 + 8),
+        (X.KeyPress, FakeDisplay.SHIFT),
+        (X.KeyPress, 38),
+        (X.KeyRelease, 38),
+        (X.KeyRelease, FakeDisplay.SHIFT),
+    ]
+
+
+def test_type_text_unmapped_char_falls_back_to_pyautogui(monkeypatch, fake_xtest):
+    display, events = fake_xtest
+    dummy = DummyPyAutoGUI()
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+
+    result = server.type_text("café")
+    assert result.success is True
+    assert events == []
+    assert display.sync_count == 0
+    assert dummy.write_calls == [{"text": "café", "interval": 0.0}]
+
+
+def test_type_text_with_interval_uses_pyautogui(monkeypatch, fake_xtest):
+    display, _ = fake_xtest
+    dummy = DummyPyAutoGUI()
+    monkeypatch.setattr(server, "_get_pyautogui", lambda: dummy)
+
+    result = server.type_text("hi", interval=0.05)
+    assert result.success is True
+    assert display.sync_count == 0
+    assert dummy.write_calls == [{"text": "hi", "interval": 0.05}]
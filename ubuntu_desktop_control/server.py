@@ -11,11 +11,15 @@ Requirements:
 - System packages: python3-xlib, scrot
 """
 
+import functools
+import hashlib
+import itertools
 import os
 import shutil
 import textwrap
+import threading
 import time
-from datetime import datetime
+from collections import OrderedDict, deque
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -29,11 +33,26 @@ _pyautogui_error: Optional[str] = None
 # Default folder inside workspace to save artifacts clients can read
 _CAPTURE_DIR_NAME = "captures"
 
+# pyatspi is a system package (python3-pyatspi). Its Registry is a process-wide
+# singleton, so the module is loaded once; a failed import is remembered so hosts
+# without AT-SPI do not repeat the sys.path search on every click.
+_pyatspi = None
+_pyatspi_error: Optional[str] = None
+
 # Element cache (invalidated by TTL or focus change)
 _ELEMENT_CACHE: Optional[Dict[str, Any]] = None
 _ELEMENT_CACHE_TTL = 5.0
 
 
+# Sequence number appended to capture filenames so same-second captures never collide
+_CAPTURE_COUNTER = itertools.count()
+
+
+def _capture_timestamp() -> str:
+    """Return a filename stamp that is unique within this process."""
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{next(_CAPTURE_COUNTER):04d}"
+
+
 def _default_output_dir() -> str:
     """Return a workspace-local capture directory, creating it if missing."""
     base = os.getcwd()
@@ -97,6 +116,23 @@ def _prompt_text(template: str) -> str:
     return textwrap.dedent(template).strip()
 
 
+# AT-SPI roles treated as clickable targets during element extraction
+_INTERACTIVE_ROLES = frozenset(
+    {
+        "push button",
+        "toggle button",
+        "check box",
+        "radio button",
+        "menu item",
+        "list item",
+        "link",
+        "entry",
+        "text",
+        "icon",
+    }
+)
+
+
 # Cache for scaling factor detection (factor, logical size, actual size)
 _scaling_factor_cache: Optional[Tuple[float, Tuple[int, int], Tuple[int, int]]] = None
 
@@ -104,6 +140,24 @@ _scaling_factor_cache: Optional[Tuple[float, Tuple[int, int], Tuple[int, int]]]
 _DIAG_CACHE: Optional[Tuple[float, Any]] = None  # (timestamp, DiagnosticInfo)
 _SCREEN_INFO_CACHE: Optional[Tuple[float, Any]] = None  # (timestamp, ScreenInfo)
 
+# Logical screen size per PyAutoGUI module, so tight click/move loops skip the X11 query
+_SCREEN_SIZE_CACHE: Optional[Tuple[float, Any, Tuple[int, int]]] = None  # (timestamp, module, size)
+_SCREEN_SIZE_TTL = 1.0
+
+
+def _get_screen_size(pyautogui_module) -> Tuple[int, int]:
+    """Return pyautogui_module.size(), reusing the last answer for up to _SCREEN_SIZE_TTL seconds."""
+    global _SCREEN_SIZE_CACHE
+
+    now = time.monotonic()
+    cache = _SCREEN_SIZE_CACHE
+    if cache is not None and cache[1] is pyautogui_module and now - cache[0] <= _SCREEN_SIZE_TTL:
+        return cache[2]
+
+    width, height = pyautogui_module.size()
+    _SCREEN_SIZE_CACHE = (now, pyautogui_module, (width, height))
+    return width, height
+
 
 def _clamp(value: float, min_value: float, max_value: float) -> float:
     return max(min_value, min(max_value, value))
@@ -121,11 +175,29 @@ def _prefer_atspi_actions() -> bool:
     return raw not in {"1", "true", "yes"}
 
 
+def _get_pyatspi():
+    """Load pyatspi once; remember failures and re-raise them as ImportError."""
+    global _pyatspi, _pyatspi_error
+
+    if _pyatspi is not None:
+        return _pyatspi
+    if _pyatspi_error is not None:
+        raise ImportError(_pyatspi_error)
+
+    try:
+        import pyatspi as _pyatspi_module
+    except Exception as exc:  # noqa: BLE001 - GI/DBus errors surface here too
+        _pyatspi_error = f"pyatspi not available: {exc}"
+        raise ImportError(_pyatspi_error) from exc
+
+    _pyatspi = _pyatspi_module
+    return _pyatspi
+
+
 def _get_active_app_name() -> Optional[str]:
     """Best-effort active application name for cache invalidation."""
     try:
-        import pyatspi
-
+        pyatspi = _get_pyatspi()
         desktop = pyatspi.Registry.getDesktop(0)
         for i in range(desktop.childCount):
             try:
@@ -143,8 +215,7 @@ def _get_active_app_name() -> Optional[str]:
 
 def _resolve_atspi_path(path: List[int]):
     """Resolve an AT-SPI element from a desktop path."""
-    import pyatspi
-
+    pyatspi = _get_pyatspi()
     desktop = pyatspi.Registry.getDesktop(0)
     node = desktop
     for idx in path:
@@ -165,8 +236,8 @@ def _attempt_atspi_action(
         return False, "No AT-SPI path available for element"
 
     try:
-        import pyatspi
-    except Exception as exc:
+        pyatspi = _get_pyatspi()
+    except ImportError as exc:
         return False, f"AT-SPI unavailable: {exc}"
 
     try:
@@ -242,7 +313,7 @@ def _get_monitor_geometry(
     bounds = dict(monitors[mss_index])
     if pyautogui_module is not None:
         try:
-            logical_w, logical_h = pyautogui_module.size()
+            logical_w, logical_h = _get_screen_size(pyautogui_module)
             physical_full = _get_fullscreen_physical_size()
             if physical_full:
                 scaling_factor, scaling_warning = _detect_scaling_factor(
@@ -314,7 +385,7 @@ def _get_cached_elements(pyautogui_module):
         return None, None
 
     try:
-        logical_w, logical_h = pyautogui_module.size()
+        logical_w, logical_h = _get_screen_size(pyautogui_module)
     except Exception:
         logical_w, logical_h = None, None
 
@@ -415,7 +486,7 @@ def _detect_scaling_factor(
         return _scaling_factor_cache[0], None
 
     try:
-        logical_w, logical_h = logical_size or pyautogui_module.size()
+        logical_w, logical_h = logical_size or _get_screen_size(pyautogui_module)
 
         # Take a quick screenshot if caller didn't provide one
         if actual_size is None:
@@ -445,6 +516,100 @@ def _detect_scaling_factor(
         return 1.0, f"Scaling detection failed; assuming 1.0x: {exc}"
 
 
+# Persistent Xlib connection for batched XTEST typing (see _xtest_type).
+_xlib_display = None
+_xlib_error: Optional[str] = None
+
+# Character -> (keycode, needs_shift), resolved once per character
+_XTEST_KEYCODES: Dict[str, Tuple[int, bool]] = {}
+
+# Control characters that do not map to a Latin-1 keysym by code point
+_XTEST_SPECIAL_KEYSYMS = {"\n": "Return", "\r": "Return", "\t": "Tab", "\b": "BackSpace"}
+
+
+def _get_xlib_display():
+    """Open a persistent Xlib display lazily and capture any connection errors."""
+    global _xlib_display, _xlib_error
+
+    if _xlib_display or _xlib_error:
+        return _xlib_display
+
+    try:
+        from Xlib import display as xlib_display
+
+        disp = xlib_display.Display()
+        if not disp.has_extension("XTEST"):
+            disp.close()
+            _xlib_error = "X server does not support the XTEST extension"
+            return None
+        _xlib_display = disp
+        return _xlib_display
+    except Exception as exc:  # noqa: BLE001 - fall back to PyAutoGUI
+        _xlib_error = f"Xlib unavailable: {exc}"
+        return None
+
+
+def _xtest_keycode(disp, char: str) -> Optional[Tuple[int, bool]]:
+    """Resolve a character to (keycode, needs_shift) on the current keymap."""
+    cached = _XTEST_KEYCODES.get(char)
+    if cached is not None:
+        return cached
+
+    from Xlib import XK
+
+    special = _XTEST_SPECIAL_KEYSYMS.get(char)
+    if special:
+        keysym = XK.string_to_keysym(special)
+    elif 0x20 <= ord(char) <= 0xFF:
+        keysym = ord(char)  # Latin-1 keysyms equal their code point
+    else:
+        return None
+
+    for keycode, index in disp.keysym_to_keycodes(keysym):
+        if index in (0, 1):
+            entry = (keycode, index == 1)
+            _XTEST_KEYCODES[char] = entry
+            return entry
+    return None
+
+
+def _xtest_type(text: str) -> bool:
+    """
+    Type text as one burst of XTEST key events with a single sync.
+
+    PyAutoGUI syncs with the X server after every key event. Here all keycodes are
+    resolved up front and the events are queued without intermediate round-trips,
+    then one sync waits until the server has processed them. That ordering matters
+    because later clicks and key presses go through PyAutoGUI's own connection.
+    Returns False without sending anything if a character cannot be mapped, so the
+    caller can fall back to PyAutoGUI.
+    """
+    disp = _get_xlib_display()
+    if disp is None:
+        return False
+
+    from Xlib import X, XK
+    from Xlib.ext import xtest
+
+    keys = []
+    for char in text:
+        entry = _xtest_keycode(disp, char)
+        if entry is None:
+            return False
+        keys.append(entry)
+
+    shift = disp.keysym_to_keycode(XK.XK_Shift_L)
+    for keycode, needs_shift in keys:
+        if needs_shift:
+            xtest.fake_input(disp, X.KeyPress, shift)
+        xtest.fake_input(disp, X.KeyPress, keycode)
+        xtest.fake_input(disp, X.KeyRelease, keycode)
+        if needs_shift:
+            xtest.fake_input(disp, X.KeyRelease, shift)
+    disp.sync()
+    return True
+
+
 def _get_screenshot_with_backend(pyautogui_module, monitor_index: Optional[int] = None):
     """
     Capture a screenshot using mss if available (faster), else fall back to PyAutoGUI.
@@ -477,6 +642,89 @@ def _get_screenshot_with_backend(pyautogui_module, monitor_index: Optional[int]
     return image, width, height, warning, {"left": 0, "top": 0}
 
 
+# Recently written images keyed by (content hash, directory, extension), oldest first
+_SAVED_IMAGE_CACHE: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+_SAVED_IMAGE_CACHE_SIZE = 8
+_SAVED_IMAGE_LOCK = threading.Lock()
+
+# Annotated screenshot formats -> PIL save options (WebP: fastest encoder method, lossy)
+_SCREENSHOT_FORMATS: Dict[str, Dict[str, Any]] = {
+    "png": {},
+    "webp": {"quality": 85, "method": 0},
+}
+
+
+def screenshot_hash(image) -> str:
+    """Return a fast content hash of a PIL image's pixels, size, and mode."""
+    digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode())
+    return digest.hexdigest()
+
+
+def _save_image_dedup(image, path: str, digest: Optional[str] = None, **save_kwargs) -> str:
+    """
+    Save an image unless identical pixels were recently written to the same directory.
+
+    Returns the path holding the image, which is an earlier file on a cache hit so
+    unchanged frames skip encoding and disk writes entirely. Pass `digest` when the
+    caller already computed screenshot_hash(image).
+    """
+    directory, filename = os.path.split(path)
+    key = (digest or screenshot_hash(image), directory, os.path.splitext(filename)[1])
+    with _SAVED_IMAGE_LOCK:
+        cached = _SAVED_IMAGE_CACHE.get(key)
+        if cached is not None and os.path.exists(cached):
+            _SAVED_IMAGE_CACHE.move_to_end(key)
+            return cached
+
+        image.save(path, **save_kwargs)
+        # The file now holds these pixels, so any entry pointing at it for others is stale
+        for stale_key in [k for k, v in _SAVED_IMAGE_CACHE.items() if v == path]:
+            del _SAVED_IMAGE_CACHE[stale_key]
+        _SAVED_IMAGE_CACHE[key] = path
+        while len(_SAVED_IMAGE_CACHE) > _SAVED_IMAGE_CACHE_SIZE:
+            _SAVED_IMAGE_CACHE.popitem(last=False)
+    return path
+
+
+@functools.lru_cache(maxsize=4)
+def _load_marker_font(size: int):
+    """Load the element marker font once per size, falling back to PIL's default."""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+def _downsample_screenshot(image, size: Tuple[int, int], fast: bool = False):
+    """
+    Shrink a PIL screenshot to `size` with area averaging.
+
+    OpenCV's INTER_AREA is the proper antialiasing filter for downscaling and runs
+    several times faster than PIL's LANCZOS; PIL is used if OpenCV is unavailable.
+    With fast=True a bilinear filter is used instead, trading some sharpness for
+    speed when the image will not be annotated.
+    """
+    if image.size == tuple(size):
+        return image
+
+    try:
+        import cv2
+        import numpy as np
+        from PIL import Image
+
+        interpolation = cv2.INTER_LINEAR if fast else cv2.INTER_AREA
+        resized = cv2.resize(np.asarray(image), size, interpolation=interpolation)
+        return Image.fromarray(resized)
+    except ImportError:
+        from PIL import Image
+
+        resample = Image.Resampling.BILINEAR if fast else Image.Resampling.LANCZOS
+        return image.resize(size, resample)
+
+
 class ScreenshotResult(BaseModel):
     """Result of a screenshot operation"""
     success: bool
@@ -622,6 +870,7 @@ class AnnotatedScreenshot(BaseModel):
         None,
         description="Top recommended elements to click (id, name, role, x_percent, y_percent)",
     )
+    screenshot_hash: Optional[str] = Field(None, description="Content hash of the annotated image (equal hashes mean identical pixels)")
     warnings: Optional[List[str]] = Field(None, description="Non-fatal warnings")
     error: Optional[str] = Field(None, description="Error message if operation failed")
 
@@ -636,6 +885,11 @@ class WorkflowAction(BaseModel):
     duration: Optional[float] = Field(None, description="Wait duration or animation duration")
     button: Optional[str] = Field(None, description="Mouse button: left, right, middle")
     monitor_index: Optional[int] = Field(None, description="Monitor index (0-based) for clicks/moves/screenshot")
+    image_format: Optional[str] = Field(None, description="Screenshot image format: png or webp")
+    depends_on: Optional[List[int]] = Field(
+        None,
+        description="Indices of earlier actions to wait for when running in parallel (default: previous action)",
+    )
 
 
 class WorkflowResult(BaseModel):
@@ -672,6 +926,7 @@ def take_screenshot(
     detect_elements: bool = True,
     output_dir: Optional[str] = None,
     monitor_index: Optional[int] = None,
+    image_format: str = "png",
 ) -> AnnotatedScreenshot:
     """
     Take an annotated screenshot with automatic element detection and downsampling.
@@ -688,10 +943,13 @@ def take_screenshot(
         detect_elements: Whether to detect and annotate UI elements (default: True).
                         If False, returns plain downsampled screenshot.
         output_dir: Directory for output files. Defaults to a workspace-local 'captures' folder.
+        image_format: Format of the annotated image: "png" (default) or "webp" (lossy,
+                      much faster to encode and smaller). The original is always PNG.
 
     Returns:
         AnnotatedScreenshot with:
         - screenshot_path: Annotated image with numbered elements (1280x720)
+        - screenshot_hash: Content hash of the annotated image, for cheap change detection
         - original_path: Full-resolution original screenshot
         - elements: List of detected elements with names, roles, and coordinates
         - element_map: Direct coordinate lookup {element_id: {x, y, width, height}}
@@ -716,11 +974,24 @@ def take_screenshot(
             error=_pyautogui_error
         )
 
+    image_format = image_format.lower()
+    if image_format not in _SCREENSHOT_FORMATS:
+        return AnnotatedScreenshot(
+            success=False,
+            screenshot_path="",
+            display_width=0,
+            display_height=0,
+            actual_width=0,
+            actual_height=0,
+            scaling_info="",
+            error=f"Invalid image_format. Must be one of: {list(_SCREENSHOT_FORMATS)}",
+        )
+
     warnings = _collect_env_warnings()
 
     try:
         # Logical screen dimensions (what PyAutoGUI uses for input coordinates)
-        logical_width, logical_height = pyautogui.size()
+        logical_width, logical_height = _get_screen_size(pyautogui)
         
         # Set output directory inside workspace so clients can read captures
         if output_dir is None:
@@ -728,7 +999,7 @@ def take_screenshot(
         else:
             os.makedirs(output_dir, exist_ok=True)
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = _capture_timestamp()
 
         monitor_bounds, monitor_warning = _get_monitor_geometry(monitor_index, pyautogui_module=pyautogui)
         if monitor_warning:
@@ -766,10 +1037,10 @@ def take_screenshot(
         
         # Save original full-resolution version
         original_path = os.path.join(output_dir, f"screenshot_original_{timestamp}.png")
-        screenshot.save(original_path)
+        # Fast zlib level: the full-resolution file is large and rarely re-read
+        original_path = _save_image_dedup(screenshot, original_path, compress_level=1)
         
         # Downsample to 1280x720 for LLM processing (huge speed improvement)
-        from PIL import Image
         target_width = 1280
         target_height = 720
         
@@ -782,7 +1053,12 @@ def take_screenshot(
         display_width = int(img_width * scale_ratio)
         display_height = int(img_height * scale_ratio)
         
-        downsampled = screenshot.resize((display_width, display_height), Image.Resampling.LANCZOS)
+        # Plain screenshots are not annotated, so a cheaper filter is good enough
+        downsampled = _downsample_screenshot(
+            screenshot,
+            (display_width, display_height),
+            fast=not detect_elements,
+        )
         
         scaling_info = (
             f"Screenshot downsampled from {img_width}x{img_height} to {display_width}x{display_height}. "
@@ -799,7 +1075,7 @@ def take_screenshot(
         if detect_elements:
             try:
                 # Try AT-SPI first (most accurate)
-                import pyatspi
+                pyatspi = _get_pyatspi()
                 
                 def run_at_spi_scan() -> None:
                     nonlocal element_id
@@ -831,20 +1107,7 @@ def take_screenshot(
                     except Exception:
                         role = ""
 
-                    interactive_roles = [
-                        "push button",
-                        "toggle button",
-                        "check box",
-                        "radio button",
-                        "menu item",
-                        "list item",
-                        "link",
-                        "entry",
-                        "text",
-                        "icon",
-                    ]
-
-                    if role in interactive_roles:
+                    if role in _INTERACTIVE_ROLES:
                         try:
                             comp = getattr(node, "component", None)
                             if comp:
@@ -948,8 +1211,6 @@ def take_screenshot(
 
                 # AT-SPI can race during app startup; retry once if empty.
                 if not elements:
-                    import time
-
                     time.sleep(0.1)
                     element_id = 1
                     elements.clear()
@@ -991,14 +1252,9 @@ def take_screenshot(
         # Create annotated version with numbered markers
         annotated = downsampled.copy()
         if elements:
-            from PIL import ImageDraw, ImageFont
+            from PIL import ImageDraw
             draw = ImageDraw.Draw(annotated)
-            
-            # Try to load a font
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-            except Exception:
-                font = ImageFont.load_default()
+            font = _load_marker_font(20)
             
             for elem in elements:
                 # Draw using percentage coordinates when available for best alignment
@@ -1037,8 +1293,14 @@ def take_screenshot(
             )
 
         # Save annotated screenshot
-        annotated_path = os.path.join(output_dir, f"screenshot_annotated_{timestamp}.png")
-        annotated.save(annotated_path)
+        annotated_path = os.path.join(output_dir, f"screenshot_annotated_{timestamp}.{image_format}")
+        annotated_hash = screenshot_hash(annotated)
+        annotated_path = _save_image_dedup(
+            annotated,
+            annotated_path,
+            digest=annotated_hash,
+            **_SCREENSHOT_FORMATS[image_format],
+        )
 
         # Cache element map for click_screen to use, with metadata for invalidation
         if element_map:
@@ -1070,6 +1332,7 @@ def take_screenshot(
             monitor_origin=origin,
             scaling_info=scaling_info,
             suggested_targets=suggested_targets,
+            screenshot_hash=annotated_hash,
             warnings=warnings or None
         )
 
@@ -1290,7 +1553,7 @@ def click_screen(
             )
 
         # Get screen dimensions
-        screen_width, screen_height = pyautogui.size()
+        screen_width, screen_height = _get_screen_size(pyautogui)
         monitor_bounds, monitor_warning = _get_monitor_geometry(monitor_index, pyautogui_module=pyautogui)
         if monitor_warning:
             warnings.append(monitor_warning)
@@ -1546,7 +1809,7 @@ def get_screen_info() -> ScreenInfo:
     warnings = _collect_env_warnings()
 
     try:
-        screen_width, screen_height = pyautogui.size()
+        screen_width, screen_height = _get_screen_size(pyautogui)
         scaling_factor, scaling_warning = _detect_scaling_factor(pyautogui)
         if scaling_warning:
             warnings.append(scaling_warning)
@@ -1574,6 +1837,26 @@ def get_screen_info() -> ScreenInfo:
         )
 
 
+@mcp.tool()
+def refresh_screen_cache() -> ScreenInfo:
+    """
+    Forget cached screen size and scaling, then re-read them.
+
+    Screen dimensions and the detected scaling factor are cached to avoid an X11
+    round-trip (and, for scaling, a throwaway screenshot) on every call. Use this
+    after changing resolution, scaling, or monitor layout mid-session.
+
+    Returns:
+        ScreenInfo freshly queried from the display
+    """
+    global _SCREEN_SIZE_CACHE, _SCREEN_INFO_CACHE, _scaling_factor_cache
+
+    _SCREEN_SIZE_CACHE = None
+    _SCREEN_INFO_CACHE = None
+    _scaling_factor_cache = None
+    return get_screen_info()
+
+
 @mcp.tool()
 def move_mouse(
     x_percent: Optional[float] = None,
@@ -1622,7 +1905,7 @@ def move_mouse(
     y = 0
 
     try:
-        screen_width, screen_height = pyautogui.size()
+        screen_width, screen_height = _get_screen_size(pyautogui)
         monitor_bounds, monitor_warning = _get_monitor_geometry(monitor_index, pyautogui_module=pyautogui)
         if monitor_warning:
             warnings.append(monitor_warning)
@@ -1777,7 +2060,8 @@ def type_text(text: str, interval: float = 0.0) -> MouseClickResult:
 
     Args:
         text: The string of text to type.
-        interval: Seconds to wait between each key press (default 0.0).
+        interval: Seconds to wait between each key press (default 0.0). With 0 the
+                  text is sent as a single XTEST burst when the X server allows it.
 
     Returns:
         MouseClickResult with success status (reused model for simplicity)
@@ -1800,7 +2084,15 @@ def type_text(text: str, interval: float = 0.0) -> MouseClickResult:
     warnings = _collect_env_warnings()
 
     try:
-        pyautogui.write(text, interval=interval)
+        # Instant typing goes out as one XTEST burst; paced typing keeps PyAutoGUI
+        typed = False
+        if interval <= 0 and text and os.environ.get("DISPLAY"):
+            fail_safe_check = getattr(pyautogui, "failSafeCheck", None)
+            if fail_safe_check:
+                fail_safe_check()
+            typed = _xtest_type(text)
+        if not typed:
+            pyautogui.write(text, interval=interval)
         return MouseClickResult(
             success=True,
             x=0,
@@ -1929,10 +2221,444 @@ def press_hotkey(keys: List[str]) -> MouseClickResult:
         )
 
 
+@mcp.tool()
+def press_hotkeys(keys_list: List[List[str]]) -> MouseClickResult:
+    """
+    Press several key combinations in order within a single call.
+
+    Equivalent to calling press_hotkey once per combination, without paying an
+    MCP round-trip for each one. Stops at the first combination that fails.
+
+    Args:
+        keys_list: Key combinations to press in order. Example: [["ctrl", "a"], ["ctrl", "c"]]
+
+    Returns:
+        MouseClickResult with success status (clicks reports combinations pressed)
+
+    Examples:
+        - press_hotkeys(keys_list=[["ctrl", "a"], ["ctrl", "c"]]) - Select all, then copy
+        - press_hotkeys(keys_list=[["alt", "tab"], ["escape"]])
+    """
+    pyautogui = _get_pyautogui()
+    if pyautogui is None:
+        return MouseClickResult(
+            success=False,
+            x=0,
+            y=0,
+            button="none",
+            clicks=0,
+            error=_pyautogui_error,
+        )
+
+    if not keys_list or any(not keys for keys in keys_list):
+        return MouseClickResult(
+            success=False,
+            x=0,
+            y=0,
+            button="none",
+            clicks=0,
+            error="keys_list must contain at least one non-empty key combination",
+        )
+
+    warnings = _collect_env_warnings()
+
+    pressed = 0
+    try:
+        for keys in keys_list:
+            pyautogui.hotkey(*keys)
+            pressed += 1
+        return MouseClickResult(
+            success=True,
+            x=0,
+            y=0,
+            button="none",
+            clicks=pressed,
+            warnings=warnings or None,
+        )
+    except Exception as e:  # noqa: BLE001
+        return MouseClickResult(
+            success=False,
+            x=0,
+            y=0,
+            button="none",
+            clicks=pressed,
+            error=f"Hotkey {pressed + 1} of {len(keys_list)} failed: {str(e)}",
+            warnings=warnings or None,
+        )
+
+
+# Upper bound on concurrently running actions in parallel workflows
+_WORKFLOW_MAX_WORKERS = 4
+
+# Mouse buttons accepted in workflow click actions (mirrors click_screen)
+_MOUSE_BUTTONS = ("left", "right", "middle")
+
+# How execute_workflow reacts to a failed action
+_WORKFLOW_ERROR_MODES = ("stop", "subtree", "continue")
+
+# Screenshots and input share X11 connections (python-xlib is not thread-safe) and
+# the global element cache, so parallel workflows run one of them at a time
+_WORKFLOW_DESKTOP_LOCK = threading.Lock()
+
+# A trailing screenshot action this recent (seconds) doubles as the final screenshot
+_FINAL_SCREENSHOT_REUSE_WINDOW = 0.05
+
+
+def _workflow_screenshot(action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Take screenshot with element detection
+    result = take_screenshot(
+        detect_elements=action_dict.get("detect_elements", True),
+        output_dir=action_dict.get("output_dir"),
+        monitor_index=action_dict.get("monitor_index"),
+        image_format=action_dict.get("image_format") or "png",
+    )
+    return {
+        "action": "screenshot",
+        "success": result.success,
+        "screenshot_path": result.screenshot_path if result.success else None,
+        "screenshot_hash": result.screenshot_hash if result.success else None,
+        "elements_detected": len(result.elements) if result.success else 0
+    }
+
+
+def _workflow_click(action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Click using element ID or percentage coordinates
+    result = click_screen(
+        x_percent=action_dict.get("x_percent"),
+        y_percent=action_dict.get("y_percent"),
+        element_id=action_dict.get("element_id"),
+        button=action_dict.get("button", "left"),
+        clicks=action_dict.get("clicks", 1),
+        monitor_index=action_dict.get("monitor_index"),
+    )
+    return {
+        "action": "click",
+        "success": result.success,
+        "x": result.x if result.success else None,
+        "y": result.y if result.success else None
+    }
+
+
+def _workflow_move(action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Move mouse
+    result = move_mouse(
+        x_percent=action_dict.get("x_percent"),
+        y_percent=action_dict.get("y_percent"),
+        element_id=action_dict.get("element_id"),
+        duration=action_dict.get("duration", 0.0),
+        monitor_index=action_dict.get("monitor_index"),
+    )
+    return {
+        "action": "move",
+        "success": result.success,
+        "x": result.x if result.success else None,
+        "y": result.y if result.success else None
+    }
+
+
+def _workflow_type(action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Type text
+    text = action_dict.get("text") or ""
+    interval = action_dict.get("interval", 0.0)
+    result = type_text(text=text, interval=interval)
+    return {
+        "action": "type",
+        "success": result.success,
+        "text_length": len(text)
+    }
+
+
+def _workflow_wait_duration(action_dict: Dict[str, Any]) -> float:
+    """Return a wait action's duration, defaulting to 0.5 seconds when unset."""
+    duration = action_dict.get("duration")
+    return 0.5 if duration is None else duration
+
+
+def _workflow_wait(action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Wait/sleep
+    duration = _workflow_wait_duration(action_dict)
+    time.sleep(duration)
+    return {
+        "action": "wait",
+        "success": True,
+        "duration": duration
+    }
+
+
+# Workflow action type -> handler; keys are the action types execute_workflow accepts
+_WORKFLOW_HANDLERS = {
+    "screenshot": _workflow_screenshot,
+    "click": _workflow_click,
+    "move": _workflow_move,
+    "type": _workflow_type,
+    "wait": _workflow_wait,
+}
+
+
+def _run_workflow_action(action_type: str, action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute one validated workflow action and return its result entry."""
+    handler = _WORKFLOW_HANDLERS.get(action_type)
+    if handler is None:
+        return {
+            "action": action_type,
+            "success": False,
+            "error": f"Unknown action type: {action_type}"
+        }
+
+    try:
+        return handler(action_dict)
+    except Exception as e:
+        return {
+            "action": action_type,
+            "success": False,
+            "error": str(e)
+        }
+
+
+def _workflow_action_run(actions: List[Dict], start: int, same: Tuple[str, ...] = ()) -> List[Dict]:
+    """Return the run of consecutive actions matching start's type and `same` fields."""
+    action_type = actions[start].get("action", "").lower()
+    expected = [actions[start].get(key) for key in same]
+    run = [actions[start]]
+    for action_dict in actions[start + 1:]:
+        if action_dict.get("action", "").lower() != action_type:
+            break
+        if [action_dict.get(key) for key in same] != expected:
+            break
+        run.append(action_dict)
+    return run
+
+
+def _run_workflow_type_batch(run: List[Dict]) -> List[Dict[str, Any]]:
+    """
+    Type a run of actions with one type_text call and split the result per action.
+
+    The batch succeeds or fails as a whole, so on failure only the first action
+    is reported (marked failed) since it is unknown how much text was typed.
+    """
+    texts = [action_dict.get("text") or "" for action_dict in run]
+    result = _run_workflow_action("type", {
+        "text": "".join(texts),
+        "interval": run[0].get("interval", 0.0),
+    })
+    if not result["success"]:
+        return [result]
+    return [
+        {"action": "type", "success": True, "text_length": len(text)}
+        for text in texts
+    ]
+
+
+def _run_workflow_wait_batch(run: List[Dict]) -> List[Dict[str, Any]]:
+    """Sleep once for the combined duration of a run of wait actions."""
+    durations = [_workflow_wait_duration(action_dict) for action_dict in run]
+    time.sleep(sum(durations))
+    return [
+        {"action": "wait", "success": True, "duration": duration}
+        for duration in durations
+    ]
+
+
+def _validate_workflow_actions(actions: List[Dict]) -> List[Dict[str, Any]]:
+    """
+    Statically check every action before any of them runs.
+
+    Catches malformed payloads, unknown action types, click/move targets that are
+    missing or outside 0.0-1.0, unknown buttons or screenshot formats, negative
+    durations or typing intervals, and depends_on entries that do not point to an
+    earlier action (which keeps the dependency graph acyclic). Returns one error
+    entry per invalid action; an empty list means the workflow may start.
+    """
+    errors: List[Dict[str, Any]] = []
+    for i, action_dict in enumerate(actions):
+        action_type = action_dict.get("action") if isinstance(action_dict, dict) else None
+        action_type = action_type.lower() if isinstance(action_type, str) else ""
+        try:
+            action = WorkflowAction(**action_dict)
+        except Exception as exc:
+            error = f"Invalid action payload: {exc}"
+        else:
+            error = None
+            interval = action_dict.get("interval", 0.0)
+            image_format = (action.image_format or "png").lower()
+            is_pointer = action_type in ("click", "move")
+            if action_type not in _WORKFLOW_HANDLERS:
+                error = f"Unknown action type: {action_type}"
+            elif is_pointer and action.element_id is None and (action.x_percent is None or action.y_percent is None):
+                error = "Must provide either element_id or both x_percent and y_percent"
+            elif is_pointer and action.element_id is None and not (
+                0.0 <= action.x_percent <= 1.0 and 0.0 <= action.y_percent <= 1.0
+            ):
+                error = "Percentage coordinates must be between 0.0 and 1.0"
+            elif action_type == "click" and action.button not in (None, *_MOUSE_BUTTONS):
+                error = f"Invalid button. Must be one of: {list(_MOUSE_BUTTONS)}"
+            elif action_type == "screenshot" and image_format not in _SCREENSHOT_FORMATS:
+                error = f"Invalid image_format. Must be one of: {list(_SCREENSHOT_FORMATS)}"
+            elif action.duration is not None and action.duration < 0:
+                error = "duration must not be negative"
+            elif not isinstance(interval, (int, float)) or interval < 0:
+                error = "interval must be a non-negative number"
+            if error is None:
+                for dep in action.depends_on or []:
+                    if not 0 <= dep < i:
+                        error = f"depends_on entries must be indices of earlier actions, got {dep}"
+                        break
+        if error is not None:
+            errors.append({
+                "action": action_type or "unknown",
+                "index": i,
+                "success": False,
+                "error": error,
+            })
+    return errors
+
+
+def _workflow_dependencies(actions: List[Dict]) -> List[List[int]]:
+    """
+    Resolve each validated action's prerequisites.
+
+    Actions without depends_on wait for the previous action, so only explicit
+    depends_on lists open up concurrency or survive a failure in subtree mode.
+    """
+    dependencies: List[List[int]] = []
+    for i, action_dict in enumerate(actions):
+        depends_on = action_dict.get("depends_on")
+        if depends_on is None:
+            dependencies.append([i - 1] if i > 0 else [])
+        else:
+            dependencies.append(sorted({int(dep) for dep in depends_on}))
+    return dependencies
+
+
+def _fuses_with_click(move_dict: Dict, next_dict: Optional[Dict]) -> bool:
+    """Whether an instant move is immediately followed by a click on the same percentage target."""
+    if next_dict is None or next_dict.get("action", "").lower() != "click":
+        return False
+    if move_dict.get("duration") or next_dict.get("depends_on") is not None:
+        return False
+    # Element clicks may go through AT-SPI actions, which never move the pointer
+    if move_dict.get("element_id") is not None or next_dict.get("element_id") is not None:
+        return False
+    return all(
+        move_dict.get(key) == next_dict.get(key)
+        for key in ("x_percent", "y_percent", "monitor_index")
+    )
+
+
+def _matches_final_screenshot(action_dict: Dict, screenshot_format: str) -> bool:
+    """Whether a screenshot action used the same settings as the workflow's final screenshot."""
+    return (
+        action_dict.get("detect_elements", True) is True
+        and action_dict.get("output_dir") is None
+        and action_dict.get("monitor_index") is None
+        and (action_dict.get("image_format") or "png") == screenshot_format
+    )
+
+
+def _run_workflow_action_exclusive(action_type: str, action_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a parallel workflow action, holding the desktop lock for anything but a wait."""
+    if action_type == "wait":
+        return _run_workflow_action(action_type, action_dict)
+    with _WORKFLOW_DESKTOP_LOCK:
+        return _run_workflow_action(action_type, action_dict)
+
+
+def _indexed_workflow_results(slots: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Drop slots for actions that never ran, tagging each kept entry with its action index.
+
+    Parallel runs can leave gaps in the middle, so results[i] is not necessarily
+    action i; the "index" field says which action each entry belongs to.
+    """
+    return [dict(result, index=i) for i, result in enumerate(slots) if result is not None]
+
+
+def _skipped_workflow_result(action_dict: Dict, failed_index: int) -> Dict[str, Any]:
+    """Result entry for an action skipped because a prerequisite failed."""
+    return {
+        "action": action_dict.get("action", "").lower(),
+        "success": False,
+        "skipped": True,
+        "error": f"Skipped: depends on failed action {failed_index}",
+    }
+
+
+def _run_workflow_parallel(
+    actions: List[Dict],
+    dependencies: List[List[int]],
+    on_error: str = "stop",
+) -> Tuple[List[Optional[Dict[str, Any]]], int]:
+    """
+    Run validated actions as a dependency graph on a thread pool.
+
+    Ready actions are handed to the pool only as workers free up. On failure, "stop"
+    cancels every action not yet started (running ones finish), "subtree" skips only
+    the failed action's descendants, and "continue" treats the failure as done.
+    Returns per-index results (None for actions that never ran under "stop") and
+    the success count.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(actions)
+    pending = [len(deps) for deps in dependencies]
+    dependents: List[List[int]] = [[] for _ in actions]
+    for i, deps in enumerate(dependencies):
+        for dep in deps:
+            dependents[dep].append(i)
+
+    completed = 0
+    failed = False
+
+    ready = deque(i for i, count in enumerate(pending) if count == 0)
+    running: Dict[Any, int] = {}
+
+    with ThreadPoolExecutor(max_workers=_WORKFLOW_MAX_WORKERS) as pool:
+        while ready or running:
+            # Only submit what a worker can start now, so a failure can still hold the rest back
+            while ready and len(running) < _WORKFLOW_MAX_WORKERS:
+                index = ready.popleft()
+                action_type = actions[index].get("action", "").lower()
+                running[pool.submit(_run_workflow_action_exclusive, action_type, actions[index])] = index
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                if future.cancelled():
+                    continue
+                results[i] = future.result()
+                if results[i]["success"]:
+                    completed += 1
+                elif on_error != "continue":
+                    if on_error == "stop" and not failed:
+                        ready.clear()
+                        for queued in running:
+                            queued.cancel()
+                    failed = True
+                    continue
+                if failed and on_error == "stop":
+                    continue
+                for dependent in dependents[i]:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+
+    if on_error == "subtree":
+        # Whatever never ran sits below a failure; report it in index order
+        for i, result in enumerate(results):
+            if result is None:
+                failed_dep = next(dep for dep in dependencies[i] if not results[dep]["success"])
+                results[i] = _skipped_workflow_result(actions[i], failed_dep)
+
+    return results, completed
+
+
 @mcp.tool()
 def execute_workflow(
     actions: List[Dict],
-    take_final_screenshot: bool = True
+    take_final_screenshot: bool = True,
+    parallel: bool = False,
+    screenshot_format: str = "png",
+    on_error: str = "stop",
 ) -> WorkflowResult:
     """
     Execute multiple actions in sequence for efficient multi-step workflows.
@@ -1953,13 +2679,26 @@ def execute_workflow(
             - text: (optional) Text to type
             - duration: (optional) Wait duration in seconds
             - button: (optional) Mouse button ("left", "right", "middle")
+            - image_format: (optional) Screenshot format, overriding screenshot_format
+            - depends_on: (optional) Indices of earlier actions to wait for (parallel) or that
+                          must succeed (on_error="subtree"). Defaults to the previous action;
+                          [] makes the action independent.
         take_final_screenshot: Whether to take a screenshot after completion (default: True)
+        parallel: Run independent actions concurrently according to depends_on (default: False).
+                  Waits overlap with other actions; screenshots and input still run one at a
+                  time because they share the X11 connection and the element cache.
+        screenshot_format: Image format for screenshot actions and the final screenshot,
+                           "png" (default) or "webp" (faster to encode, smaller files)
+        on_error: What to do when an action fails:
+                  - "stop" (default): run nothing further
+                  - "subtree": skip only actions that depend on the failed one
+                  - "continue": keep going as if it had succeeded
 
     Returns:
         WorkflowResult with:
         - success: Whether all actions completed successfully
         - actions_completed: Number of actions executed
-        - results: List of individual action results
+        - results: List of individual action results, each tagged with its action "index"
         - final_screenshot: Path to final screenshot (if enabled)
 
     Example:
@@ -1970,6 +2709,13 @@ def execute_workflow(
             {"action": "type", "text": "Hello"},
             {"action": "click", "x_percent": 0.5, "y_percent": 0.8}
         ])
+
+        # Capture the second monitor while a menu animation settles on the first
+        execute_workflow(actions=[
+            {"action": "click", "element_id": 3},
+            {"action": "wait", "duration": 0.5},
+            {"action": "screenshot", "monitor_index": 1, "depends_on": [0]},
+        ], parallel=True)
     """
     pyautogui = _get_pyautogui()
     if pyautogui is None:
@@ -1980,124 +2726,140 @@ def execute_workflow(
             error=_pyautogui_error
         )
 
-    results = []
+    if on_error not in _WORKFLOW_ERROR_MODES:
+        return WorkflowResult(
+            success=False,
+            actions_completed=0,
+            total_actions=len(actions),
+            error=f"Invalid on_error. Must be one of: {list(_WORKFLOW_ERROR_MODES)}",
+        )
+
+    screenshot_format = screenshot_format.lower()
+    if screenshot_format not in _SCREENSHOT_FORMATS:
+        return WorkflowResult(
+            success=False,
+            actions_completed=0,
+            total_actions=len(actions),
+            error=f"Invalid screenshot_format. Must be one of: {list(_SCREENSHOT_FORMATS)}",
+        )
+
+    # Filled by action index; entries stay None for actions that never ran
+    slots: List[Optional[Dict[str, Any]]] = [None] * len(actions)
     completed = 0
     
     try:
-        for i, action_dict in enumerate(actions):
-            action_type = action_dict.get("action", "").lower()
-            monitor_index = action_dict.get("monitor_index")
-
-            try:
-                # Validate action shape
-                try:
-                    WorkflowAction(**action_dict)
-                except Exception as exc:
-                    results.append({
-                        "action": action_type or "unknown",
-                        "success": False,
-                        "error": f"Invalid action payload: {exc}",
-                    })
-                    break
+        # Reject the whole batch before any side effect if an action is statically invalid
+        validation_errors = _validate_workflow_actions(actions)
+        if validation_errors:
+            first = validation_errors[0]
+            return WorkflowResult(
+                success=False,
+                actions_completed=0,
+                total_actions=len(actions),
+                results=validation_errors,
+                error=f"Action {first['index']} is invalid: {first['error']}",
+            )
 
-                if action_type == "screenshot":
-                    # Take screenshot with element detection
-                    result = take_screenshot(
-                        detect_elements=action_dict.get("detect_elements", True),
-                        output_dir=action_dict.get("output_dir"),
-                        monitor_index=monitor_index,
-                    )
-                    results.append({
-                        "action": "screenshot",
-                        "success": result.success,
-                        "screenshot_path": result.screenshot_path if result.success else None,
-                        "elements_detected": len(result.elements) if result.success else 0
-                    })
-                    
-                elif action_type == "click":
-                    # Click using element ID or percentage coordinates
-                    result = click_screen(
-                        x_percent=action_dict.get("x_percent"),
-                        y_percent=action_dict.get("y_percent"),
-                        element_id=action_dict.get("element_id"),
-                        button=action_dict.get("button", "left"),
-                        clicks=action_dict.get("clicks", 1),
-                        monitor_index=monitor_index,
-                    )
-                    results.append({
-                        "action": "click",
-                        "success": result.success,
-                        "x": result.x if result.success else None,
-                        "y": result.y if result.success else None
-                    })
-                    
-                elif action_type == "move":
-                    # Move mouse
-                    result = move_mouse(
-                        x_percent=action_dict.get("x_percent"),
-                        y_percent=action_dict.get("y_percent"),
-                        element_id=action_dict.get("element_id"),
-                        duration=action_dict.get("duration", 0.0),
-                        monitor_index=monitor_index,
-                    )
-                    results.append({
-                        "action": "move",
-                        "success": result.success,
-                        "x": result.x if result.success else None,
-                        "y": result.y if result.success else None
-                    })
-                    
-                elif action_type == "type":
-                    # Type text
-                    text = action_dict.get("text", "")
-                    interval = action_dict.get("interval", 0.0)
-                    result = type_text(text=text, interval=interval)
-                    results.append({
-                        "action": "type",
-                        "success": result.success,
-                        "text_length": len(text)
-                    })
-                    
-                elif action_type == "wait":
-                    # Wait/sleep
-                    import time
-                    duration = action_dict.get("duration", 0.5)
-                    time.sleep(duration)
-                    results.append({
-                        "action": "wait",
-                        "success": True,
-                        "duration": duration
-                    })
-                    
-                else:
-                    results.append({
-                        "action": action_type,
-                        "success": False,
-                        "error": f"Unknown action type: {action_type}"
-                    })
+        if screenshot_format != "png":
+            actions = [
+                dict(action_dict, image_format=screenshot_format)
+                if action_dict["action"].lower() == "screenshot" and not action_dict.get("image_format")
+                else action_dict
+                for action_dict in actions
+            ]
+
+        # A lone action has nothing to overlap with, so skip the thread pool entirely
+        run_parallel = parallel and len(actions) > 1
+        dependencies = None
+        last_screenshot = None  # (action index, monotonic time it finished), sequential runs only
+        if run_parallel or on_error == "subtree":
+            dependencies = _workflow_dependencies(actions)
+
+        if run_parallel:
+            slots, completed = _run_workflow_parallel(actions, dependencies, on_error)
+        else:
+            failed_indices = set()
+            index = 0
+            while index < len(actions):
+                i = index
+                action_dict = actions[i]
+                action_type = action_dict.get("action", "").lower()
+                index += 1
+
+                if dependencies is not None:
+                    failed_deps = [dep for dep in dependencies[i] if dep in failed_indices]
+                    if failed_deps:
+                        slots[i] = _skipped_workflow_result(action_dict, failed_deps[0])
+                        failed_indices.add(i)
+                        continue
+
+                next_dict = actions[index] if index < len(actions) else None
+                if action_type == "move" and _fuses_with_click(action_dict, next_dict):
+                    # Clicking at the target moves the pointer there anyway, so skip the separate move
+                    index += 1
+                    click_result = _run_workflow_action("click", actions[i + 1])
+                    move_result = {key: value for key, value in click_result.items() if key != "action"}
+                    slots[i] = {"action": "move", **move_result}
+                    slots[i + 1] = click_result
+                    if click_result["success"]:
+                        completed += 2
+                    elif on_error == "stop":
+                        break
+                    else:
+                        failed_indices.update((i, i + 1))
                     continue
-                
+
+                # Batches succeed or fail as a whole, so only batch when any failure stops the run
+                if on_error == "stop" and action_type in ("type", "wait"):
+                    # Consecutive type actions are sent as a single keystroke burst and
+                    # consecutive waits become a single sleep
+                    if action_type == "type":
+                        run = _workflow_action_run(actions, i, same=("interval",))
+                    else:
+                        run = _workflow_action_run(actions, i)
+                    if len(run) > 1:
+                        index += len(run) - 1
+                        if action_type == "type":
+                            batch_results = _run_workflow_type_batch(run)
+                        else:
+                            batch_results = _run_workflow_wait_batch(run)
+                        for offset, batch_result in enumerate(batch_results):
+                            slots[i + offset] = batch_result
+                        if not batch_results[0]["success"]:
+                            break
+                        completed += len(batch_results)
+                        continue
+
+                result = _run_workflow_action(action_type, action_dict)
+                slots[i] = result
+
                 # Check if action succeeded
-                if results[-1]["success"]:
+                if result["success"]:
                     completed += 1
-                else:
-                    # Stop on failure
+                    if action_type == "screenshot":
+                        last_screenshot = (i, time.monotonic())
+                elif on_error == "stop":
                     break
-                    
-            except Exception as e:
-                results.append({
-                    "action": action_type,
-                    "success": False,
-                    "error": str(e)
-                })
-                break
+                else:
+                    failed_indices.add(i)
         
+        results = _indexed_workflow_results(slots)
+
         # Take final screenshot if requested and all actions succeeded
         final_screenshot_path = None
         if take_final_screenshot and completed == len(actions):
-            final_result = take_screenshot()
-            if final_result.success:
-                final_screenshot_path = final_result.screenshot_path
+            if (
+                last_screenshot is not None
+                and last_screenshot[0] == len(actions) - 1
+                and time.monotonic() - last_screenshot[1] < _FINAL_SCREENSHOT_REUSE_WINDOW
+                and _matches_final_screenshot(actions[-1], screenshot_format)
+            ):
+                # The workflow just ended on an equivalent capture of the same frame
+                final_screenshot_path = results[-1]["screenshot_path"]
+            else:
+                final_result = take_screenshot(image_format=screenshot_format)
+                if final_result.success:
+                    final_screenshot_path = final_result.screenshot_path
         
         return WorkflowResult(
             success=(completed == len(actions)),
@@ -2112,7 +2874,7 @@ def execute_workflow(
             success=False,
             actions_completed=completed,
             total_actions=len(actions),
-            results=results,
+            results=_indexed_workflow_results(slots),
             error=f"Workflow execution failed: {str(e)}"
         )
 
@@ -2376,10 +3138,10 @@ def map_GUI_elements_location(
 
             # Persist the captured screenshot so clients can inspect it
             capture_dir = _default_output_dir()
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _capture_timestamp()
             captured_path = os.path.join(capture_dir, f"screenshot_elements_{timestamp}.png")
             try:
-                pil_image.save(captured_path)
+                captured_path = _save_image_dedup(pil_image, captured_path, compress_level=1)
             except Exception as save_exc:  # noqa: BLE001 - best-effort persistence
                 warnings.append(f"Failed to save screenshot to {captured_path}: {save_exc}")
                 captured_path = None
@@ -2397,49 +3159,79 @@ def map_GUI_elements_location(
                 warnings.append(scaling_warning)
             coordinate_space = "logical"
 
-        # 2. Process Image (Edge Detection)
+        # 2. Detect elements on the loaded image
+        return _map_gui_elements_from_array(
+            image,
+            min_area=min_area,
+            max_area=max_area,
+            debug_output_path=debug_output_path,
+            scaling_factor=scaling_factor,
+            coordinate_space=coordinate_space,
+            screenshot_path=captured_path,
+            warnings=warnings,
+        )
+
+    except Exception as e:
+        return GUIElementMapResult(
+            success=False,
+            elements=[],
+            count=0,
+            error=f"Detection failed: {str(e)}",
+            screenshot_path=captured_path,
+            coordinates=coordinate_space,
+            warnings=warnings or None
+        )
+
+
+def _map_gui_elements_from_array(
+    image,
+    *,
+    min_area: int = 100,
+    max_area: Optional[int] = None,
+    debug_output_path: Optional[str] = None,
+    scaling_factor: Optional[float] = 1.0,
+    coordinate_space: str = "physical",
+    screenshot_path: Optional[str] = None,
+    warnings: Optional[List[str]] = None,
+) -> GUIElementMapResult:
+    """Detect GUI elements on an already-loaded BGR image (see map_GUI_elements_location)."""
+    import cv2
+    import numpy as np
+
+    try:
+        # Edge detection
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
+
         # Apply Canny edge detection
         edges = cv2.Canny(gray, 50, 150)
-        
+
         # Dilate edges to connect gaps
         kernel = np.ones((3, 3), np.uint8)
         dilated = cv2.dilate(edges, kernel, iterations=1)
-        
+
         # Find contours
         contours, hierarchy = cv2.findContours(dilated, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        
-        detected_elements = []
-        element_id = 1
-        
-        # Prepare debug image if requested
-        debug_image = None
-        if debug_output_path:
-            debug_image = image.copy()
 
-        for contour in contours:
-            # Get bounding box
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            
-            # Filter by area
-            if area < min_area:
-                continue
-            if max_area and area > max_area:
-                continue
-                
-            if coordinate_space == "logical" and scaling_factor not in (None, 0, 1.0):
-                x = int(x / scaling_factor)
-                y = int(y / scaling_factor)
-                w = max(1, int(w / scaling_factor))
-                h = max(1, int(h / scaling_factor))
-            # Calculate center
-            center_x = x + w // 2
-            center_y = y + h // 2
-            
-            # Add to list
-            element = GUIElement(
+        # Bounding boxes for every contour as one (N, 4) array of x, y, w, h
+        boxes = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int64).reshape(-1, 4)
+        areas = boxes[:, 2] * boxes[:, 3]
+
+        # Filter by area
+        keep = areas >= min_area
+        if max_area:
+            keep &= areas <= max_area
+        boxes = boxes[keep]
+        areas = areas[keep]
+
+        if coordinate_space == "logical" and scaling_factor not in (None, 0, 1.0):
+            boxes = (boxes / scaling_factor).astype(np.int64)
+            boxes[:, 2:] = np.maximum(boxes[:, 2:], 1)
+
+        # Calculate centers
+        centers = boxes[:, :2] + boxes[:, 2:] // 2
+
+        detected_elements = [
+            GUIElement(
                 id=element_id,
                 x=x,
                 y=y,
@@ -2449,15 +3241,20 @@ def map_GUI_elements_location(
                 center_y=center_y,
                 area=area
             )
-            detected_elements.append(element)
-            
-            # Draw on debug image
-            if debug_image is not None:
+            for element_id, ((x, y, w, h), (center_x, center_y), area) in enumerate(
+                zip(boxes.tolist(), centers.tolist(), areas.tolist()), start=1
+            )
+        ]
+
+        # Draw on debug image if requested
+        debug_image = None
+        if debug_output_path:
+            debug_image = image.copy()
+            for element in detected_elements:
+                x, y, w, h = element.x, element.y, element.width, element.height
                 cv2.rectangle(debug_image, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                cv2.circle(debug_image, (center_x, center_y), 2, (0, 0, 255), -1)
-                cv2.putText(debug_image, str(element_id), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-            
-            element_id += 1
+                cv2.circle(debug_image, (element.center_x, element.center_y), 2, (0, 0, 255), -1)
+                cv2.putText(debug_image, str(element.id), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
 
         # Save debug image
         saved_debug_path = None
@@ -2472,7 +3269,7 @@ def map_GUI_elements_location(
             elements=detected_elements,
             count=len(detected_elements),
             debug_image_path=saved_debug_path,
-            screenshot_path=captured_path,
+            screenshot_path=screenshot_path,
             scaling_factor=scaling_factor,
             coordinates=coordinate_space,
             warnings=warnings or None
@@ -2484,13 +3281,12 @@ def map_GUI_elements_location(
             elements=[],
             count=0,
             error=f"Detection failed: {str(e)}",
-            screenshot_path=captured_path,
+            screenshot_path=screenshot_path,
             coordinates=coordinate_space,
             warnings=warnings or None
         )
 
 
-
 # MCP prompt templates
 
 